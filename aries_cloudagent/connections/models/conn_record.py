@@ -1,15 +1,16 @@
 """Handle connection information interface with non-secrets storage."""
 
+import asyncio
 import json
 
 from enum import Enum
 from typing import Any, Union
 
-from marshmallow import fields, validate
+from marshmallow import fields
 
 from ...core.profile import ProfileSession
 from ...messaging.models.base_record import BaseRecord, BaseRecordSchema
-from ...messaging.valid import INDY_DID, INDY_RAW_PUBLIC_KEY, UUIDFour
+from ...messaging.valid import INDY_DID, INDY_RAW_PUBLIC_KEY, OneOfSet, UUIDFour
 
 from ...protocols.connections.v1_0.message_types import (
     CONNECTION_INVITATION,
@@ -28,10 +29,55 @@ from ...storage.base import BaseStorage
 from ...storage.record import StorageRecord
 from ...storage.error import StorageNotFoundError
 
+# Message classes by @type, qualified or not; anything else is OOB or DID exchange
+_INVITATION_CLASSES = {
+    CONNECTION_INVITATION: ConnectionInvitation,
+    **DIDCommPrefix.qualify_all({CONNECTION_INVITATION: ConnectionInvitation}),
+}
+_REQUEST_CLASSES = {
+    CONNECTION_REQUEST: ConnectionRequest,
+    **DIDCommPrefix.qualify_all({CONNECTION_REQUEST: ConnectionRequest}),
+}
+
+
+def _session_storage(session: ProfileSession) -> BaseStorage:
+    """Get the storage instance for a session, injecting it only once."""
+    storage = vars(session).get("_conn_storage")
+    if storage is None:
+        storage = session.inject(BaseStorage)
+        session._conn_storage = storage
+    return storage
+
+
+def _metadata_cache(session: ProfileSession) -> dict:
+    """Get per-session snapshots of connection metadata, by connection id."""
+    cache = vars(session).get("_conn_metadata_cache")
+    if cache is None:
+        cache = {}
+        session._conn_metadata_cache = cache
+    return cache
+
 
 class ConnRecord(BaseRecord):
     """Represents a single pairwise connection."""
 
+    __slots__ = (
+        "my_did",
+        "their_did",
+        "their_label",
+        "their_role",
+        "invitation_key",
+        "invitation_msg_id",
+        "request_id",
+        "error_msg",
+        "inbound_connection_id",
+        "routing_state",
+        "accept",
+        "invitation_mode",
+        "alias",
+        "their_public_did",
+    )
+
     class Meta:
         """ConnRecord metadata."""
 
@@ -57,9 +103,7 @@ class ConnRecord(BaseRecord):
         def get(cls, label: Union[str, "ConnRecord.Role"]):
             """Get role enum for label."""
             if isinstance(label, str):
-                for role in ConnRecord.Role:
-                    if label in role.value:
-                        return role
+                return cls._LABEL_MAP.get(label)
             elif isinstance(label, ConnRecord.Role):
                 return label
             return None
@@ -74,7 +118,16 @@ class ConnRecord(BaseRecord):
 
         def __eq__(self, other: Union[str, "ConnRecord.Role"]) -> bool:
             """Comparison between roles."""
-            return self is ConnRecord.Role.get(other)
+            if self is other:
+                return True
+            if isinstance(other, str):
+                return self is ConnRecord.Role._LABEL_MAP.get(other)
+            return False
+
+        __hash__ = Enum.__hash__  # defining __eq__ would otherwise unset it
+
+    Role._LABEL_MAP = {label: role for role in Role for label in role.value}
+    Role._RFC160_MAP = {label: role.rfc160 for role in Role for label in role.value}
 
     class State(Enum):
         """
@@ -129,16 +182,31 @@ class ConnRecord(BaseRecord):
         def get(cls, label: Union[str, "ConnRecord.State"]):
             """Get state enum for label."""
             if isinstance(label, str):
-                for state in ConnRecord.State:
-                    if label in state.value:
-                        return state
+                return cls._LABEL_MAP.get(label)
             elif isinstance(label, ConnRecord.State):
                 return label
             return None
 
         def __eq__(self, other: Union[str, "ConnRecord.State"]) -> bool:
             """Comparison between states."""
-            return self is ConnRecord.State.get(other)
+            if self is other:
+                return True
+            if isinstance(other, str):
+                return self is ConnRecord.State._LABEL_MAP.get(other)
+            return False
+
+        __hash__ = Enum.__hash__  # defining __eq__ would otherwise unset it
+
+    State._LABEL_MAP = {label: state for state in State for label in state.value}
+    State._RFC160_MAP = {
+        label: state.rfc160 for state in State for label in (state, *state.value)
+    }
+
+    _READY_STATES = frozenset(
+        label
+        for state in (State.COMPLETED, State.RESPONSE)
+        for label in (state, *state.value)
+    )
 
     RECORD_ID_NAME = "connection_id"
     WEBHOOK_TOPIC = "connections"
@@ -153,14 +221,26 @@ class ConnRecord(BaseRecord):
     INVITATION_MODE_ONCE = "once"
     INVITATION_MODE_MULTI = "multi"
     INVITATION_MODE_STATIC = "static"
+    INVITATION_MODES = (
+        INVITATION_MODE_ONCE,
+        INVITATION_MODE_MULTI,
+        INVITATION_MODE_STATIC,
+    )
 
     ROUTING_STATE_NONE = "none"
     ROUTING_STATE_REQUEST = "request"
     ROUTING_STATE_ACTIVE = "active"
     ROUTING_STATE_ERROR = "error"
+    ROUTING_STATES = (
+        ROUTING_STATE_NONE,
+        ROUTING_STATE_REQUEST,
+        ROUTING_STATE_ACTIVE,
+        ROUTING_STATE_ERROR,
+    )
 
     ACCEPT_MANUAL = "manual"
     ACCEPT_AUTO = "auto"
+    ACCEPT_MODES = (ACCEPT_MANUAL, ACCEPT_AUTO)
 
     def __init__(
         self,
@@ -188,19 +268,18 @@ class ConnRecord(BaseRecord):
         """Initialize a new ConnRecord."""
         super().__init__(
             connection_id,
-            state=(ConnRecord.State.get(state) or ConnRecord.State.INIT).rfc160,
+            state=ConnRecord.State._RFC160_MAP.get(state, ConnRecord.State.INIT.rfc160),
             **kwargs,
         )
         self.my_did = my_did
         self.their_did = their_did
         self.their_label = their_label
-        self.their_role = (
-            ConnRecord.Role.get(their_role).rfc160
-            if isinstance(their_role, str)
-            else None
-            if their_role is None
-            else their_role.rfc160
-        )
+        if isinstance(their_role, str):
+            self.their_role = ConnRecord.Role._RFC160_MAP.get(their_role)
+            if self.their_role is None:
+                raise ValueError(f"Unknown connection role: {their_role}")
+        else:
+            self.their_role = None if their_role is None else their_role.rfc160
         self.invitation_key = invitation_key
         self.invitation_msg_id = invitation_msg_id
         self.request_id = request_id
@@ -226,20 +305,17 @@ class ConnRecord(BaseRecord):
     def record_value(self) -> dict:
         """Accessor to for the JSON record value properties for this connection."""
         return {
-            prop: getattr(self, prop)
-            for prop in (
-                "their_role",
-                "inbound_connection_id",
-                "routing_state",
-                "accept",
-                "invitation_mode",
-                "invitation_msg_id",
-                "alias",
-                "error_msg",
-                "their_label",
-                "state",
-                "their_public_did",
-            )
+            "their_role": self.their_role,
+            "inbound_connection_id": self.inbound_connection_id,
+            "routing_state": self.routing_state,
+            "accept": self.accept,
+            "invitation_mode": self.invitation_mode,
+            "invitation_msg_id": self.invitation_msg_id,
+            "alias": self.alias,
+            "error_msg": self.error_msg,
+            "their_label": self.their_label,
+            "state": self.state,
+            "their_public_did": self.their_public_did,
         }
 
     @classmethod
@@ -319,7 +395,7 @@ class ConnRecord(BaseRecord):
             invitation.to_json(),
             {"connection_id": self.connection_id},
         )
-        storage = session.inject(BaseStorage)
+        storage = _session_storage(session)
         await storage.add_record(record)
 
     async def retrieve_invitation(
@@ -331,17 +407,13 @@ class ConnRecord(BaseRecord):
             session: The active profile session
         """
         assert self.connection_id
-        storage = session.inject(BaseStorage)
+        storage = _session_storage(session)
         result = await storage.find_record(
             self.RECORD_TYPE_INVITATION,
             {"connection_id": self.connection_id},
         )
         ser = json.loads(result.value)
-        return (
-            ConnectionInvitation
-            if DIDCommPrefix.unqualify(ser["@type"]) == CONNECTION_INVITATION
-            else OOBInvitation
-        ).deserialize(ser)
+        return _INVITATION_CLASSES.get(ser["@type"], OOBInvitation).deserialize(ser)
 
     async def attach_request(
         self,
@@ -360,7 +432,7 @@ class ConnRecord(BaseRecord):
             request.to_json(),
             {"connection_id": self.connection_id},
         )
-        storage: BaseStorage = session.inject(BaseStorage)
+        storage: BaseStorage = _session_storage(session)
         await storage.add_record(record)
 
     async def retrieve_request(
@@ -373,24 +445,75 @@ class ConnRecord(BaseRecord):
             session: The active profile session
         """
         assert self.connection_id
-        storage: BaseStorage = session.inject(BaseStorage)
+        storage: BaseStorage = _session_storage(session)
         result = await storage.find_record(
             self.RECORD_TYPE_REQUEST, {"connection_id": self.connection_id}
         )
         ser = json.loads(result.value)
-        return (
-            ConnectionRequest
-            if DIDCommPrefix.unqualify(ser["@type"]) == CONNECTION_REQUEST
-            else DIDXRequest
-        ).deserialize(ser)
+        return _REQUEST_CLASSES.get(ser["@type"], DIDXRequest).deserialize(ser)
+
+    async def persist_initial(
+        self,
+        session: ProfileSession,
+        *,
+        invitation: Union[ConnectionInvitation, OOBInvitation] = None,
+        request: Union[ConnectionRequest, DIDXRequest] = None,
+        metadata: dict = None,
+    ):
+        """Persist related invitation, request, and metadata of a new connection.
+
+        Storage records are added under one asyncio.gather. This saves awaits
+        in the caller only: backends such as Askar and indy-sdk serialize
+        operations on a single session or wallet handle. Metadata keys must not
+        yet exist for this connection: use metadata_set to update existing values.
+
+        Args:
+            session: The active profile session
+            invitation: The invitation to relate to this connection record
+            request: The request to relate to this connection record
+            metadata: Metadata values by key; values should be JSON compatible
+        """
+        assert self.connection_id
+        records = []
+        if invitation is not None:
+            records.append(
+                StorageRecord(
+                    self.RECORD_TYPE_INVITATION,
+                    invitation.to_json(),
+                    {"connection_id": self.connection_id},
+                )
+            )
+        if request is not None:
+            records.append(
+                StorageRecord(
+                    self.RECORD_TYPE_REQUEST,
+                    request.to_json(),
+                    {"connection_id": self.connection_id},
+                )
+            )
+        values = {key: json.dumps(value) for key, value in (metadata or {}).items()}
+        for key, value in values.items():
+            records.append(
+                StorageRecord(
+                    self.RECORD_TYPE_METADATA,
+                    value,
+                    {"key": key, "connection_id": self.connection_id},
+                )
+            )
+        if not records:
+            return
+
+        storage: BaseStorage = _session_storage(session)
+        await asyncio.gather(*(storage.add_record(record) for record in records))
+
+        snapshot = _metadata_cache(session).get(self.connection_id)
+        if snapshot is not None:
+            snapshot.update(values)
 
     @property
     def is_ready(self) -> str:
         """Accessor for connection readiness."""
-        return ConnRecord.State.get(self.state) in (
-            ConnRecord.State.COMPLETED,
-            ConnRecord.State.RESPONSE,
-        )
+        return self.state in ConnRecord._READY_STATES
 
     @property
     def is_multiuse_invitation(self) -> bool:
@@ -414,6 +537,9 @@ class ConnRecord(BaseRecord):
     ) -> Any:
         """Retrieve arbitrary metadata associated with this connection.
 
+        If metadata_get_all has already loaded this connection's metadata in
+        the session, the value comes from that snapshot rather than storage.
+
         Args:
             session (ProfileSession): session used for storage
             key (str): key identifying metadata
@@ -425,7 +551,11 @@ class ConnRecord(BaseRecord):
 
         """
         assert self.connection_id
-        storage: BaseStorage = session.inject(BaseStorage)
+        snapshot = _metadata_cache(session).get(self.connection_id)
+        if snapshot is not None:
+            return json.loads(snapshot[key]) if key in snapshot else default
+
+        storage: BaseStorage = _session_storage(session)
         try:
             record = await storage.find_record(
                 self.RECORD_TYPE_METADATA,
@@ -445,7 +575,7 @@ class ConnRecord(BaseRecord):
         """
         assert self.connection_id
         value = json.dumps(value)
-        storage: BaseStorage = session.inject(BaseStorage)
+        storage: BaseStorage = _session_storage(session)
         try:
             record = await storage.find_record(
                 self.RECORD_TYPE_METADATA,
@@ -460,6 +590,10 @@ class ConnRecord(BaseRecord):
             )
             await storage.add_record(record)
 
+        snapshot = _metadata_cache(session).get(self.connection_id)
+        if snapshot is not None:
+            snapshot[key] = value
+
     async def metadata_delete(self, session: ProfileSession, key: str):
         """Delete custom metadata associated with this connection.
 
@@ -468,7 +602,7 @@ class ConnRecord(BaseRecord):
             key (str): key of metadata to delete
         """
         assert self.connection_id
-        storage: BaseStorage = session.inject(BaseStorage)
+        storage: BaseStorage = _session_storage(session)
         try:
             record = await storage.find_record(
                 self.RECORD_TYPE_METADATA,
@@ -478,9 +612,22 @@ class ConnRecord(BaseRecord):
         except StorageNotFoundError as err:
             raise KeyError(f"{key} not found in connection metadata") from err
 
+        snapshot = _metadata_cache(session).get(self.connection_id)
+        if snapshot is not None:
+            snapshot.pop(key, None)
+
     async def metadata_get_all(self, session: ProfileSession) -> dict:
         """Return all custom metadata associated with this connection.
 
+        Fetches all metadata in a single storage query and retains the result
+        for the session, so that subsequent metadata_get calls on this
+        connection need not go back to storage.
+
+        The snapshot does not expire: it reflects writes made through this
+        session's metadata_set and metadata_delete only, not writes from other
+        sessions. Avoid it on long-lived sessions that must observe metadata
+        changed elsewhere, and re-read in a fresh session instead.
+
         Args:
             session (ProfileSession): session used for storage
 
@@ -489,12 +636,26 @@ class ConnRecord(BaseRecord):
 
         """
         assert self.connection_id
-        storage: BaseStorage = session.inject(BaseStorage)
-        records = await storage.find_all_records(
-            self.RECORD_TYPE_METADATA,
-            {"connection_id": self.connection_id},
-        )
-        return {record.tags["key"]: json.loads(record.value) for record in records}
+        cache = _metadata_cache(session)
+        snapshot = cache.get(self.connection_id)
+        if snapshot is None:
+            storage: BaseStorage = _session_storage(session)
+            records = await storage.find_all_records(
+                self.RECORD_TYPE_METADATA,
+                {"connection_id": self.connection_id},
+            )
+            snapshot = {record.tags["key"]: record.value for record in records}
+            cache[self.connection_id] = snapshot
+        return {key: json.loads(value) for key, value in snapshot.items()}
+
+    async def delete_record(self, session: ProfileSession):
+        """Remove the stored record, and any metadata snapshot in the session.
+
+        Args:
+            session: The profile session to use
+        """
+        await super().delete_record(session)
+        _metadata_cache(session).pop(self.connection_id, None)
 
     def __eq__(self, other: Any) -> bool:
         """Comparison between records."""
@@ -524,9 +685,7 @@ class ConnRecordSchema(BaseRecordSchema):
     their_role = fields.Str(
         required=False,
         description="Their role in the connection protocol",
-        validate=validate.OneOf(
-            [label for role in ConnRecord.Role for label in role.value]
-        ),
+        validate=OneOfSet(list(ConnRecord.Role._LABEL_MAP)),
         example=ConnRecord.Role.REQUESTER.rfc23,
     )
     rfc23_state = fields.Str(
@@ -555,26 +714,14 @@ class ConnRecordSchema(BaseRecordSchema):
     routing_state = fields.Str(
         required=False,
         description="Routing state of connection",
-        validate=validate.OneOf(
-            [
-                getattr(ConnRecord, m)
-                for m in vars(ConnRecord)
-                if m.startswith("ROUTING_STATE_")
-            ]
-        ),
+        validate=OneOfSet(ConnRecord.ROUTING_STATES),
         example=ConnRecord.ROUTING_STATE_ACTIVE,
     )
     accept = fields.Str(
         required=False,
         description="Connection acceptance: manual or auto",
         example=ConnRecord.ACCEPT_AUTO,
-        validate=validate.OneOf(
-            [
-                getattr(ConnRecord, a)
-                for a in vars(ConnRecord)
-                if a.startswith("ACCEPT_")
-            ]
-        ),
+        validate=OneOfSet(ConnRecord.ACCEPT_MODES),
     )
     error_msg = fields.Str(
         required=False,
@@ -585,13 +732,7 @@ class ConnRecordSchema(BaseRecordSchema):
         required=False,
         description="Invitation mode",
         example=ConnRecord.INVITATION_MODE_ONCE,
-        validate=validate.OneOf(
-            [
-                getattr(ConnRecord, i)
-                for i in vars(ConnRecord)
-                if i.startswith("INVITATION_MODE_")
-            ]
-        ),
+        validate=OneOfSet(ConnRecord.INVITATION_MODES),
     )
     alias = fields.Str(
         required=False,
@@ -1,4 +1,7 @@
+import json
+
 from asynctest import TestCase as AsyncTestCase
+from asynctest import mock as async_mock
 
 from ....core.in_memory import InMemoryProfile
 from ....protocols.connections.v1_0.messages.connection_invitation import (
@@ -8,8 +11,12 @@ from ....protocols.connections.v1_0.messages.connection_request import Connectio
 from ....protocols.connections.v1_0.models.connection_detail import ConnectionDetail
 from ....storage.base import BaseStorage
 from ....storage.error import StorageNotFoundError
+from ....storage.record import StorageRecord
+from ....protocols.didcomm_prefix import DIDCommPrefix
+
+from .. import conn_record as test_module
 
-from ..conn_record import ConnRecord
+from ..conn_record import ConnRecord, ConnRecordSchema
 from ..diddoc.diddoc import DIDDoc
 
 
@@ -47,6 +54,13 @@ class TestConnRecord(AsyncTestCase):
             ConnRecord.State.get(ConnRecord.State.RESPONSE) is ConnRecord.State.RESPONSE
         )
 
+        for role in ConnRecord.Role:
+            assert ConnRecord.Role.get(role.rfc160) is role
+            assert ConnRecord.Role.get(role.rfc23) is role
+        for state in ConnRecord.State:
+            assert ConnRecord.State.get(state.rfc160) is state
+            assert ConnRecord.State.get(state.rfc23) is state
+
         assert ConnRecord.Role.REQUESTER.flip() is ConnRecord.Role.RESPONDER
         assert ConnRecord.Role.get(
             ConnRecord.Role.REQUESTER.rfc160
@@ -54,6 +68,50 @@ class TestConnRecord(AsyncTestCase):
         assert ConnRecord.Role.REQUESTER == ConnRecord.Role.REQUESTER.rfc160  # check ==
         assert ConnRecord.Role.REQUESTER == ConnRecord.Role.REQUESTER.rfc23
         assert ConnRecord.Role.REQUESTER != ConnRecord.Role.RESPONDER.rfc23
+        assert ConnRecord.Role.REQUESTER != ConnRecord.Role.RESPONDER
+        assert ConnRecord.Role.REQUESTER != ConnRecord.State.REQUEST
+        assert ConnRecord.State.INIT != None
+
+        assert len(set(ConnRecord.Role)) == len(ConnRecord.Role)  # check hashable
+        assert {state: state.rfc160 for state in ConnRecord.State}[
+            ConnRecord.State.COMPLETED
+        ] == ConnRecord.State.COMPLETED.rfc160
+
+    async def test_init_their_role(self):
+        with self.assertRaises(ValueError):
+            ConnRecord(their_role="Larry")
+        assert ConnRecord(their_role=None).their_role is None
+        assert (
+            ConnRecord(their_role=ConnRecord.Role.RESPONDER).their_role
+            == ConnRecord.Role.RESPONDER.rfc160
+        )
+        mock_role = async_mock.MagicMock(rfc160="dummy")
+        assert ConnRecord(their_role=mock_role).their_role == "dummy"
+
+    async def test_schema_validate_choices(self):
+        schema = ConnRecordSchema()
+        assert not schema.validate(
+            {
+                "their_role": ConnRecord.Role.RESPONDER.rfc23,
+                "routing_state": ConnRecord.ROUTING_STATE_ACTIVE,
+                "accept": ConnRecord.ACCEPT_AUTO,
+                "invitation_mode": ConnRecord.INVITATION_MODE_MULTI,
+            }
+        )
+        errors = schema.validate(
+            {
+                "their_role": "Larry",
+                "routing_state": "a suffusion of yellow",
+                "accept": ["auto"],
+                "invitation_mode": None,
+            }
+        )
+        assert set(errors) == {
+            "their_role",
+            "routing_state",
+            "accept",
+            "invitation_mode",
+        }
 
     async def test_state_rfc23strict(self):
         for state in (
@@ -196,6 +254,14 @@ class TestConnRecord(AsyncTestCase):
 
         assert fetched.is_ready is False
 
+    async def test_is_ready_any_state_label(self):
+        record = ConnRecord(my_did=self.test_did)
+        for state in ConnRecord.State:
+            expected = state in (ConnRecord.State.COMPLETED, ConnRecord.State.RESPONSE)
+            for label in (state, state.rfc160, state.rfc23):
+                record.state = label
+                assert record.is_ready is expected
+
     async def test_invitation_is_not_multi_use(self):
         record = ConnRecord(
             my_did=self.test_did,
@@ -234,6 +300,22 @@ class TestConnRecord(AsyncTestCase):
         retrieved = await record.retrieve_invitation(self.session)
         assert isinstance(retrieved, ConnectionInvitation)
 
+    async def test_attach_retrieve_invitation_lone_surrogate(self):
+        record = ConnRecord(
+            my_did=self.test_did,
+            state=ConnRecord.State.INVITATION.rfc23,
+        )
+        await record.save(self.session)
+
+        invi = ConnectionInvitation(
+            label="bad\ud800label",
+            recipient_keys=[self.test_verkey],
+            endpoint="http://localhost:8999",
+        )
+        await record.attach_invitation(self.session, invi)
+        retrieved = await record.retrieve_invitation(self.session)
+        assert retrieved.label == "bad\ud800label"
+
     async def test_attach_retrieve_request(self):
         record = ConnRecord(
             my_did=self.test_did,
@@ -251,6 +333,119 @@ class TestConnRecord(AsyncTestCase):
         retrieved = await record.retrieve_request(self.session)
         assert isinstance(retrieved, ConnectionRequest)
 
+    async def test_persist_initial(self):
+        record = ConnRecord(
+            my_did=self.test_did,
+            state=ConnRecord.State.INVITATION.rfc23,
+        )
+        await record.save(self.session)
+
+        invi = ConnectionInvitation(
+            label="abc123",
+            recipient_keys=[self.test_verkey],
+            endpoint="http://localhost:8999",
+        )
+        req = ConnectionRequest(
+            connection=ConnectionDetail(
+                did=self.test_did, did_doc=DIDDoc(self.test_did)
+            ),
+            label="abc123",
+        )
+        await record.persist_initial(
+            self.session,
+            invitation=invi,
+            request=req,
+            metadata={"key": {"test": "value"}, "other": "other"},
+        )
+        assert isinstance(
+            await record.retrieve_invitation(self.session), ConnectionInvitation
+        )
+        assert isinstance(
+            await record.retrieve_request(self.session), ConnectionRequest
+        )
+        assert await record.metadata_get_all(self.session) == {
+            "key": {"test": "value"},
+            "other": "other",
+        }
+
+        await record.persist_initial(self.session)  # nothing to persist
+
+    async def test_retrieve_dispatch_by_type(self):
+        record = ConnRecord(
+            my_did=self.test_did,
+            state=ConnRecord.State.INVITATION.rfc23,
+        )
+        await record.save(self.session)
+        storage = self.session.inject(BaseStorage)
+
+        invi = ConnectionInvitation(
+            label="abc123",
+            recipient_keys=[self.test_verkey],
+            endpoint="http://localhost:8999",
+        )
+        req = ConnectionRequest(
+            connection=ConnectionDetail(
+                did=self.test_did, did_doc=DIDDoc(self.test_did)
+            ),
+            label="abc123",
+        )
+
+        async def stored(record_type, msg, msg_type):
+            for result in await storage.find_all_records(
+                record_type, {"connection_id": record.connection_id}
+            ):
+                await storage.delete_record(result)
+            ser = msg.serialize()
+            ser["@type"] = msg_type
+            await storage.add_record(
+                StorageRecord(
+                    record_type,
+                    json.dumps(ser),
+                    {"connection_id": record.connection_id},
+                )
+            )
+
+        for pfx in DIDCommPrefix:
+            await stored(
+                ConnRecord.RECORD_TYPE_INVITATION,
+                invi,
+                pfx.qualify(test_module.CONNECTION_INVITATION),
+            )
+            retrieved = await record.retrieve_invitation(self.session)
+            assert isinstance(retrieved, ConnectionInvitation)
+
+            await stored(
+                ConnRecord.RECORD_TYPE_REQUEST,
+                req,
+                pfx.qualify(test_module.CONNECTION_REQUEST),
+            )
+            retrieved = await record.retrieve_request(self.session)
+            assert isinstance(retrieved, ConnectionRequest)
+
+        await stored(
+            ConnRecord.RECORD_TYPE_INVITATION,
+            invi,
+            DIDCommPrefix.NEW.qualify("out-of-band/1.0/invitation"),
+        )
+        await stored(
+            ConnRecord.RECORD_TYPE_REQUEST,
+            req,
+            DIDCommPrefix.NEW.qualify("didexchange/1.0/request"),
+        )
+        with async_mock.patch.object(
+            test_module.OOBInvitation, "deserialize", async_mock.MagicMock()
+        ) as mock_oob_deser, async_mock.patch.object(
+            test_module.DIDXRequest, "deserialize", async_mock.MagicMock()
+        ) as mock_didx_deser:
+            assert (
+                await record.retrieve_invitation(self.session)
+                is mock_oob_deser.return_value
+            )
+            assert (
+                await record.retrieve_request(self.session)
+                is mock_didx_deser.return_value
+            )
+
     async def test_ser_rfc23_state_present(self):
         record = ConnRecord(
             state=ConnRecord.State.INVITATION,
@@ -351,3 +546,55 @@ class TestConnRecord(AsyncTestCase):
         )
         await record.save(self.session)
         assert await record.metadata_get_all(self.session) == {}
+
+    async def test_metadata_get_all_caches_for_session(self):
+        record = ConnRecord(
+            my_did=self.test_did,
+        )
+        await record.save(self.session)
+        await record.metadata_set(self.session, "key", {"test": "value"})
+        await record.metadata_get_all(self.session)
+
+        storage = self.session.inject(BaseStorage)
+        with async_mock.patch.object(
+            storage, "find_record", async_mock.CoroutineMock()
+        ) as mock_find:
+            assert await record.metadata_get(self.session, "key") == {"test": "value"}
+            assert await record.metadata_get(self.session, "other", "dflt") == "dflt"
+            mock_find.assert_not_called()
+
+        await record.metadata_set(self.session, "other", {"test": "other"})
+        await record.metadata_delete(self.session, "key")
+        assert await record.metadata_get(self.session, "key") is None
+        assert await record.metadata_get_all(self.session) == {
+            "other": {"test": "other"}
+        }
+
+    async def test_slots_repr(self):
+        record = ConnRecord(my_did=self.test_did, alias="Bob")
+        assert "my_did" not in record.__dict__
+        assert f"my_did='{self.test_did}'" in repr(record)
+        assert "alias='Bob'" in repr(record)
+
+    async def test_session_storage_injected_once(self):
+        record = ConnRecord(my_did=self.test_did)
+        await record.save(self.session)
+        with async_mock.patch.object(
+            self.session, "inject", wraps=self.session.inject
+        ) as mock_inject:
+            await record.metadata_set(self.session, "key", "value")
+            await record.metadata_set(self.session, "key", "updated")
+            assert await record.metadata_get(self.session, "key") == "updated"
+            mock_inject.assert_called_once_with(BaseStorage)
+
+    async def test_delete_record_clears_metadata_snapshot(self):
+        record = ConnRecord(
+            my_did=self.test_did,
+        )
+        await record.save(self.session)
+        await record.metadata_set(self.session, "key", {"test": "value"})
+        await record.metadata_get_all(self.session)
+        assert record.connection_id in self.session._conn_metadata_cache
+
+        await record.delete_record(self.session)
+        assert record.connection_id not in self.session._conn_metadata_cache
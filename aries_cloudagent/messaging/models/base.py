@@ -199,10 +199,13 @@ class BaseModel(ABC):
 
         """
         exclude = resolve_meta_property(self, "repr_exclude", [])
+        attrs = dict(getattr(self, "__dict__", {}))
+        for cls in reversed(self.__class__.__mro__):
+            for slot in cls.__dict__.get("__slots__", ()):
+                if slot not in ("__dict__", "__weakref__") and hasattr(self, slot):
+                    attrs[slot] = getattr(self, slot)
         items = (
-            "{}={}".format(k, repr(v))
-            for k, v in self.__dict__.items()
-            if k not in exclude
+            "{}={}".format(k, repr(v)) for k, v in attrs.items() if k not in exclude
         )
         return "<{}({})>".format(self.__class__.__name__, ", ".join(items))
 
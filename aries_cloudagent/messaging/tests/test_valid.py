@@ -34,6 +34,7 @@ from ..valid import (
     SHA256,
     UUID4,
     WHOLE_NUM,
+    OneOfSet,
 )
 
 
@@ -287,6 +288,16 @@ class TestValid(TestCase):
 
         INDY_SCHEMA_ID["validate"]("Q4zqM7aXqm7gDQkUVLng9h:2:bc-reg:1.0")
 
+    def test_one_of_set(self):
+        validator = OneOfSet(["b", "a"], error="Value {input} must be one of {choices}")
+        assert validator.choices_text == "b, a"
+        for non_choice in ["c", "", None, ["a"], {"a": 1}]:
+            with self.assertRaises(ValidationError):
+                validator(non_choice)
+
+        validator("a")
+        validator("b")
+
     def test_predicate(self):
         non_predicates = [">>", "", " >= ", "<<<=", "==", "=", "!="]
         for non_predicate in non_predicates:
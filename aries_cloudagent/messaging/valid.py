@@ -17,6 +17,25 @@ from ..wallet.did_posture import DIDPosture as DIDPostureEnum
 B58 = alphabet if isinstance(alphabet, str) else alphabet.decode("ascii")
 
 
+class OneOfSet(OneOf):
+    """OneOf validator checking membership against a frozenset of its choices."""
+
+    def __init__(self, choices, *args, **kwargs):
+        """Initializer; retain choices in order for display, as a set for lookup."""
+        super().__init__(choices, *args, **kwargs)
+        self._choice_set = frozenset(self.choices)
+
+    def __call__(self, value) -> str:
+        """Validate value by set membership."""
+        try:
+            if value not in self._choice_set:
+                raise ValidationError(self._format_error(value))
+        except TypeError as error:
+            raise ValidationError(self._format_error(value)) from error
+
+        return value
+
+
 class IntEpoch(Range):
     """Validate value against (integer) epoch format."""
 
@@ -176,7 +195,7 @@ class DIDKey(Regexp):
         )
 
 
-class DIDPosture(OneOf):
+class DIDPosture(OneOfSet):
     """Validate value against defined DID postures."""
 
     EXAMPLE = DIDPostureEnum.WALLET_ONLY.moniker
@@ -306,7 +325,7 @@ class IndyCredRevId(Regexp):
         )
 
 
-class IndyPredicate(OneOf):
+class IndyPredicate(OneOfSet):
     """Validate value against indy predicate."""
 
     EXAMPLE = ">="
@@ -510,7 +529,7 @@ class Endpoint(Regexp):  # using Regexp brings in nice visual validator cue
         )
 
 
-class EndpointType(OneOf):
+class EndpointType(OneOfSet):
     """Validate value against allowed endpoint/service types."""
 
     EXAMPLE = EndpointTypeEnum.ENDPOINT.w3c